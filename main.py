@@ -8,31 +8,78 @@ and sends transcript chunks to Laravel via HTTP POST.
 """
 
 import asyncio
-import json
+import collections
 import os
-import base64
+import re
 import signal
+import socket
 import sys
+import time
 import logging
-from urllib.parse import urlparse, parse_qs
+import multiprocessing
+import warnings
+from binascii import a2b_base64
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
 import websockets
+from websockets.asyncio.server import serve
 import aiohttp
+import orjson
 from deepgram import DeepgramClient, LiveOptions, LiveTranscriptionEvents
 from dotenv import load_dotenv
 
-# Configure logging
+# C mu-law decoder in the stdlib; deprecated in 3.11 and removed in 3.13, where the
+# audioop-lts package (see requirements.txt) provides the same module
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore', DeprecationWarning)
+    import audioop
+
+load_dotenv()
+
+# Configure logging. Per-transcript and per-request logs are at INFO, so busy
+# deployments can set LOG_LEVEL=WARNING to skip them entirely.
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
-load_dotenv()
-
 DEEPGRAM_API_KEY = os.getenv('DEEPGRAM_API_KEY')
 LARAVEL_API_URL = os.getenv('LARAVEL_API_URL', 'http://laravel:8000')
 LARAVEL_API_TOKEN = os.getenv('LARAVEL_API_TOKEN')
 MEDIA_STREAM_PORT = int(os.getenv('MEDIA_STREAM_PORT', 8080))
+# Number of server processes sharing the port via SO_REUSEPORT
+MEDIA_STREAM_WORKERS = int(os.getenv('MEDIA_STREAM_WORKERS', 1))
+# Max transcripts coalesced into one POST to /api/media-stream/batch (1 disables batching)
+TRANSCRIPT_BATCH_MAX = int(os.getenv('TRANSCRIPT_BATCH_MAX', 1))
+# How long a batch waits for more transcripts before it is posted
+TRANSCRIPT_BATCH_WINDOW_MS = int(os.getenv('TRANSCRIPT_BATCH_WINDOW_MS', 250))
+# Twilio frames are coalesced into chunks of this many PCM16 bytes (960 = 60ms at 8kHz)
+# before being sent to Deepgram, or once the oldest buffered audio is DEEPGRAM_CHUNK_MAX_MS old
+DEEPGRAM_CHUNK_BYTES = int(os.getenv('DEEPGRAM_CHUNK_BYTES', 960))
+DEEPGRAM_CHUNK_MAX_MS = int(os.getenv('DEEPGRAM_CHUNK_MAX_MS', 80))
+# Threads for blocking Deepgram audio sends. Each call's feed task holds at most one,
+# so size this to the concurrent calls a worker should serve without queueing sends.
+DEEPGRAM_SEND_THREADS = int(os.getenv('DEEPGRAM_SEND_THREADS', 64))
+# Threads for Deepgram handshakes (start) and teardowns (finish), kept apart from sends
+DEEPGRAM_CONTROL_THREADS = int(os.getenv('DEEPGRAM_CONTROL_THREADS', 8))
+# Fixed kernel receive buffer size for accepted Twilio sockets (disables autotuning)
+SOCKET_BUFFER_SIZE = 262144
+# How often each call logs its media packet counts
+MEDIA_STATS_INTERVAL = int(os.getenv('MEDIA_STATS_INTERVAL', 10))
+
+# Headers for every Laravel request, set on the shared HTTP session. Bodies are
+# posted as pre-encoded orjson bytes, so Content-Type must be set here.
+_LARAVEL_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json',
+}
+if LARAVEL_API_TOKEN:
+    _LARAVEL_HEADERS['Authorization'] = f'Bearer {LARAVEL_API_TOKEN}'
+
+# Laravel endpoints, built once rather than per POST
+_LARAVEL_TRANSCRIPT_URL = f"{LARAVEL_API_URL}/api/media-stream"
+_LARAVEL_BATCH_URL = f"{LARAVEL_API_URL}/api/media-stream/batch"
 
 # Validate required environment variables
 if not DEEPGRAM_API_KEY:
@@ -44,24 +91,137 @@ if not LARAVEL_API_URL:
     sys.exit(1)
 
 
+_BIG_ENDIAN_HOST = sys.byteorder == 'big'
+
+# Fast-path extraction for Twilio 'media' frames, which arrive as compact JSON
+_EVENT_PREFIX = b'{"event":"'
+_MEDIA_EVENT_PREFIX = b'{"event":"media"'
+# Events the stream loop acts on; others ('mark', 'dtmf', 'stop') are skipped unparsed
+_HANDLED_EVENT_PREFIXES = (_MEDIA_EVENT_PREFIX, b'{"event":"start"')
+_MEDIA_PAYLOAD_RE = re.compile(rb'"payload":"([^"]+)"')
+_MEDIA_TRACK_RE = re.compile(rb'"track":"([^"]+)"')
+
+def build_live_options():
+    """Build the Deepgram LiveOptions shared by every call"""
+    # Only final transcripts are posted to Laravel, so interim results are turned off
+    # rather than streamed and discarded. utterance_end_ms needs interim results and
+    # nothing here listens for UtteranceEnd, so it goes too.
+    # Twilio sends mu-law audio at 8000 Hz, converted to PCM16
+    # Deepgram should auto-detect the format, but we'll try specifying it
+    try:
+        # Try with sample_rate and encoding first
+        options = LiveOptions(
+            model="nova-2",
+            language="en-US",
+            smart_format=True,
+            interim_results=False,
+            vad_events=True,
+            diarize=True,  # Enable speaker diarization
+            sample_rate=8000,
+            encoding="linear16",
+        )
+        logger.info("Created LiveOptions with speaker diarization enabled")
+    except TypeError:
+        # If those parameters aren't supported, use basic options
+        logger.warning("sample_rate/encoding not supported in LiveOptions, using basic options")
+        try:
+            options = LiveOptions(
+                model="nova-2",
+                language="en-US",
+                smart_format=True,
+                interim_results=False,
+                vad_events=True,
+                diarize=True,  # Enable speaker diarization
+            )
+            logger.info("Created LiveOptions with speaker diarization (basic options)")
+        except TypeError:
+            # Fallback if diarize is not supported
+            logger.warning("diarize not supported in LiveOptions, using basic options without diarization")
+            options = LiveOptions(
+                model="nova-2",
+                language="en-US",
+                smart_format=True,
+                interim_results=False,
+                vad_events=True,
+            )
+            logger.info("Created LiveOptions with basic options (no diarization)")
+    return options
+
+
+# Built once; LiveClient.start copies the options into its own dict
+_LIVE_OPTIONS = build_live_options()
+
+
+class StreamState:
+    """Per-call state shared by the Twilio reader, the Deepgram tasks and the transcript handler"""
+
+    __slots__ = (
+        'call_session_id', 'twilio_call_sid', 'websocket', 'deepgram',
+        'media_count', 'speaker_stats', 'total_transcripts',
+        'track_to_speaker', 'track_counts', 'current_track', 'track_history',
+        'audio_buffer', 'flush_timer', 'dropped_audio',
+        'audio_queue', 'feed_task', 'transcript_queue', 'drain_task', 'stats_task',
+    )
+
+    def __init__(self, websocket):
+        # Filled in from the URL, the 'connected' event or the 'start' event, whichever has it first
+        self.call_session_id = None
+        self.twilio_call_sid = None
+        self.websocket = websocket
+        self.deepgram = None
+        self.media_count = 0  # Track number of media packets received
+        self.speaker_stats = {'va': 0, 'prospect': 0, 'system': 0}
+        self.total_transcripts = 0  # Running sum of speaker_stats
+        self.track_to_speaker = {'inbound': 'va', 'outbound': 'prospect'}  # Direct mapping: track -> speaker
+        self.track_counts = {'inbound': 0, 'outbound': 0, 'unknown': 0}  # Media packets per track
+        self.current_track = None  # Track which track we're currently receiving audio from
+        self.track_history = []  # List of (timestamp, track) tuples to help match transcripts to tracks
+        self.audio_buffer = bytearray()  # PCM waiting to be sent to Deepgram as one chunk
+        self.flush_timer = None  # Pending flush of a partly filled audio_buffer
+        self.dropped_audio = 0
+        # Per-call queues and the tasks draining them, set once Deepgram is up
+        self.audio_queue = None
+        self.feed_task = None
+        self.transcript_queue = None
+        self.drain_task = None
+        self.stats_task = None
+
+
 class MediaStreamHandler:
     def __init__(self):
         if not DEEPGRAM_API_KEY:
             raise ValueError("DEEPGRAM_API_KEY is required")
         self.deepgram = DeepgramClient(DEEPGRAM_API_KEY)
+        # Per-call state keyed by call_session_id. The Deepgram connections are also
+        # kept in their own dict so shutdown can walk them without touching the rest.
         self.active_streams = {}
+        self.deepgram_connections = {}
         self.server = None
         self.http_session = None
-
-    async def handle_twilio_stream(self, websocket, path):
+        # Event loop the server runs on, for scheduling work from Deepgram's thread
+        self.loop = None
+        # Audio sends get their own pool so they never wait behind other blocking work
+        # on the loop's default executor
+        self.deepgram_send_executor = ThreadPoolExecutor(
+            max_workers=DEEPGRAM_SEND_THREADS, thread_name_prefix='deepgram-send'
+        )
+        # start() and finish() block for a handshake or a thread join; a burst of calls
+        # starting or ending queues here instead of holding up audio sends
+        self.deepgram_control_executor = ThreadPoolExecutor(
+            max_workers=DEEPGRAM_CONTROL_THREADS, thread_name_prefix='deepgram-control'
+        )
+        self._transcript_log_count = 0
+
+    async def handle_twilio_stream(self, websocket):
         """Handle incoming Twilio Media Stream WebSocket connection"""
-        call_session_id = None
+        path = websocket.request.path
         twilio_call_sid = None
         deepgram_connection = None
-        call_session_id_ref = [None]  # Mutable reference, initialized early
+        connection_info = StreamState(websocket)
+        transcript_consumer = None
 
-        # Get the current event loop for scheduling async tasks from sync callbacks
-        event_loop = asyncio.get_event_loop()
+        # Event loop for scheduling async tasks from sync callbacks
+        event_loop = self.loop
 
         try:
             # Log the full path including query parameters
@@ -69,99 +229,93 @@ class MediaStreamHandler:
             logger.info(f"New WebSocket connection from {websocket.remote_address}")
             logger.info(f"Full path received: {path}")
 
+            self.tune_socket(websocket)
+
             # Parse query parameters from the WebSocket URL path
             # Twilio sends parameters as query string in the path
-            # Handle both cases: path with or without query string
-            if '?' in path:
-                parsed_path = urlparse(f"http://dummy{path}")
-            else:
-                # If no query string in path, try to get from request headers
-                parsed_path = urlparse(f"http://dummy{path}")
-
-            query_params = parse_qs(parsed_path.query)
+            query_string = path.partition('?')[2]
+            query_params = dict(parse_qsl(query_string)) if query_string else {}
             logger.info(f"Query parameters extracted: {query_params}")
 
-            # Extract parameters (parse_qs returns lists, so get first element)
-            call_session_id_ref[0] = query_params.get('callSessionId', [None])[0]
-            twilio_call_sid = query_params.get('twilioCallSid', [None])[0]
-
-            # Also check for alternative parameter names
-            if not call_session_id_ref[0]:
-                call_session_id_ref[0] = query_params.get('callSession', [None])[0]
-            if not twilio_call_sid:
-                twilio_call_sid = query_params.get('callSid', [None])[0]
+            # Extract parameters, also checking the alternative parameter names
+            connection_info.call_session_id = query_params.get('callSessionId') or query_params.get('callSession')
+            twilio_call_sid = query_params.get('twilioCallSid') or query_params.get('callSid')
 
-            logger.info(f"Parsed parameters from URL - Call session ID: {call_session_id_ref[0]}, Twilio SID: {twilio_call_sid}")
+            logger.info(f"Parsed parameters from URL - Call session ID: {connection_info.call_session_id}, Twilio SID: {twilio_call_sid}")
 
             # Twilio sends a 'connected' event message first with Parameter values
             # The <Parameter> elements from TwiML are sent in the 'connected' event payload
             try:
-                initial_message = await asyncio.wait_for(websocket.recv(), timeout=5.0)
-                if isinstance(initial_message, str):
-                    try:
-                        params = json.loads(initial_message)
-                        event_type = params.get('event')
-                        logger.info(f"Received initial message from Twilio: event={event_type}")
-                        # Log the full payload to see what Twilio actually sends
+                initial_message = await asyncio.wait_for(websocket.recv(decode=False), timeout=5.0)
+                # orjson parses bytes and str alike, so frames need no decode step
+                try:
+                    params = orjson.loads(initial_message)
+                    event_type = params.get('event')
+                    logger.info(f"Received initial message from Twilio: event={event_type}")
+                    # Log the full payload to see what Twilio actually sends
+                    if logger.isEnabledFor(logging.DEBUG):
                         try:
-                            logger.info(f"Full message payload: {json.dumps(params, indent=2)}")
+                            logger.debug(f"Full message payload: {orjson.dumps(params, option=orjson.OPT_INDENT_2).decode()}")
                         except Exception as e:
                             logger.warning(f"Could not serialize payload: {e}")
-                            logger.info(f"Payload keys: {list(params.keys()) if isinstance(params, dict) else 'Not a dict'}")
-
-                        # Twilio sends 'connected' event first
-                        if event_type == 'connected':
-                            logger.info("Twilio Media Stream connected")
-                            # According to Twilio docs, <Parameter> elements are sent as query params in URL
-                            # But if not in URL, they might be in the message payload
-                            # Check all possible locations in the payload
-
-                            # Check for parameters in various possible locations
-                            if 'params' in params:
-                                call_session_id_ref[0] = call_session_id_ref[0] or params['params'].get('callSessionId')
-                                twilio_call_sid = twilio_call_sid or params['params'].get('twilioCallSid')
-
-                            # Check direct fields
-                            call_session_id_ref[0] = call_session_id_ref[0] or params.get('callSessionId') or params.get('callSession')
-                            twilio_call_sid = twilio_call_sid or params.get('twilioCallSid') or params.get('callSid')
-
-                            # Check in protocol object if it exists
-                            if 'protocol' in params and isinstance(params['protocol'], dict):
-                                call_session_id_ref[0] = call_session_id_ref[0] or params['protocol'].get('callSessionId')
-                                twilio_call_sid = twilio_call_sid or params['protocol'].get('twilioCallSid')
-
-                            # Check in streamSid or other fields
-                            if 'streamSid' in params:
-                                logger.info(f"Stream SID: {params.get('streamSid')}")
-
-                            logger.info(f"After parsing connected event - Call session ID: {call_session_id_ref[0]}, Twilio SID: {twilio_call_sid}")
-
-                            # If still no call_session_id, don't close yet - wait for 'start' event
-                            if not call_session_id_ref[0]:
-                                logger.warning("No call_session_id in connected event, will check 'start' event")
-                        else:
-                            # If it's not a connected event, try to extract parameters anyway
-                            call_session_id_ref[0] = call_session_id_ref[0] or params.get('callSessionId') or params.get('callSession')
-                            twilio_call_sid = twilio_call_sid or params.get('twilioCallSid') or params.get('callSid')
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"Initial message is not JSON: {initial_message[:100]}, error: {e}")
+                            logger.debug(f"Payload keys: {list(params.keys()) if isinstance(params, dict) else 'Not a dict'}")
+
+                    # Twilio sends 'connected' event first
+                    if event_type == 'connected':
+                        logger.info("Twilio Media Stream connected")
+                        # According to Twilio docs, <Parameter> elements are sent as query params in URL
+                        # But if not in URL, they might be in the message payload
+                        # Check all possible locations in the payload
+
+                        # Check for parameters in various possible locations
+                        if 'params' in params:
+                            connection_info.call_session_id = connection_info.call_session_id or params['params'].get('callSessionId')
+                            twilio_call_sid = twilio_call_sid or params['params'].get('twilioCallSid')
+
+                        # Check direct fields
+                        connection_info.call_session_id = connection_info.call_session_id or params.get('callSessionId') or params.get('callSession')
+                        twilio_call_sid = twilio_call_sid or params.get('twilioCallSid') or params.get('callSid')
+
+                        # Check in protocol object if it exists
+                        if 'protocol' in params and isinstance(params['protocol'], dict):
+                            connection_info.call_session_id = connection_info.call_session_id or params['protocol'].get('callSessionId')
+                            twilio_call_sid = twilio_call_sid or params['protocol'].get('twilioCallSid')
+
+                        # Check in streamSid or other fields
+                        if 'streamSid' in params:
+                            logger.info(f"Stream SID: {params.get('streamSid')}")
+
+                        logger.info(f"After parsing connected event - Call session ID: {connection_info.call_session_id}, Twilio SID: {twilio_call_sid}")
+
+                        # If still no call_session_id, don't close yet - wait for 'start' event
+                        if not connection_info.call_session_id:
+                            logger.warning("No call_session_id in connected event, will check 'start' event")
+                    else:
+                        # If it's not a connected event, try to extract parameters anyway
+                        connection_info.call_session_id = connection_info.call_session_id or params.get('callSessionId') or params.get('callSession')
+                        twilio_call_sid = twilio_call_sid or params.get('twilioCallSid') or params.get('callSid')
+                except orjson.JSONDecodeError as e:
+                    logger.warning(f"Initial message is not JSON: {initial_message[:100]}, error: {e}")
             except asyncio.TimeoutError:
                 logger.warning("Timeout waiting for initial 'connected' message from Twilio")
 
             # Don't close connection if we don't have call_session_id yet
             # Continue processing messages - parameters might come in 'start' event
-            if not call_session_id_ref[0]:
+            if not connection_info.call_session_id:
                 logger.warning("No call_session_id found yet, continuing to process messages")
                 logger.warning(f"Path was: {path}, Query params: {query_params}")
                 # Continue - we'll check for call_session_id in subsequent messages
             else:
-                logger.info(f"Processing stream for call session: {call_session_id_ref[0]}")
+                # JSON parameters may not be strings; normalize once for every payload built later
+                connection_info.call_session_id = str(connection_info.call_session_id)
+                logger.info(f"Processing stream for call session: {connection_info.call_session_id}")
 
             # Create Deepgram live connection
             # For Deepgram SDK 3.2.7, the API is: deepgram.listen.websocket.v("1")
             try:
                 # Check what methods are available on listen object
-                logger.debug(f"Available methods on listen: {dir(self.deepgram.listen)}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Available methods on listen: {dir(self.deepgram.listen)}")
                 deepgram_connection = self.deepgram.listen.websocket.v("1")
             except AttributeError as e:
                 logger.error(f"Deepgram API error - 'websocket' not found: {e}")
@@ -181,24 +335,28 @@ class MediaStreamHandler:
                 return
 
             # Set up Deepgram event handlers
-            # call_session_id_ref is already initialized as a mutable reference
+            # Deepgram SDK calls handlers from its own thread. Results are appended to a
+            # deque and one long-lived consumer task on the event loop processes them in
+            # order, rather than scheduling a new coroutine per transcript.
+            transcript_events = collections.deque()
+            transcript_wakeup = asyncio.Event()
+            transcript_consumer = asyncio.create_task(
+                self.consume_transcripts(connection_info, transcript_events, transcript_wakeup)
+            )
 
             def transcript_handler(*args, **kwargs):
-                logger.info(f"Transcript handler called! args count: {len(args)}, kwargs: {list(kwargs.keys())}")
-                current_id = call_session_id_ref[0]
-                if current_id:
-                    logger.info(f"Scheduling async task for transcript processing, call_session_id: {current_id}")
-                    # Deepgram SDK calls handlers from its own thread, so we need to use run_coroutine_threadsafe
-                    # to schedule the async function on the event loop from a different thread
-                    # Pass both args and kwargs to preserve the result object
-                    coro = self.on_deepgram_transcript(*args, call_session_id=current_id, **kwargs)
-                    try:
-                        # Schedule the coroutine on the event loop from this thread
-                        asyncio.run_coroutine_threadsafe(coro, event_loop)
-                    except Exception as e:
-                        logger.error(f"Error scheduling transcript task: {e}", exc_info=True)
-                else:
-                    logger.warning("Received transcript but no call_session_id yet")
+                # Pass both args and kwargs to preserve the result object
+                transcript_events.append((args, kwargs))
+                # Skip the wakeup (a self-pipe write) if the consumer is already due to run.
+                # It clears the event before draining, so anything appended before the
+                # clear is still picked up.
+                if transcript_wakeup.is_set():
+                    return
+                try:
+                    event_loop.call_soon_threadsafe(transcript_wakeup.set)
+                except RuntimeError:
+                    # Event loop already closed during shutdown
+                    pass
 
             # Register event handlers
             deepgram_connection.on(LiveTranscriptionEvents.Open, self.on_deepgram_open)
@@ -210,51 +368,11 @@ class MediaStreamHandler:
             logger.info("Deepgram event handlers registered: Open, Transcript, Error, Close")
 
             # Start Deepgram connection
-            # Twilio sends mu-law audio at 8000 Hz, converted to PCM16
-            # Deepgram should auto-detect the format, but we'll try specifying it
             try:
-                # Try with sample_rate and encoding first
-                try:
-                    options = LiveOptions(
-                        model="nova-2",
-                        language="en-US",
-                        smart_format=True,
-                        interim_results=True,
-                        utterance_end_ms=1000,
-                        vad_events=True,
-                        diarize=True,  # Enable speaker diarization
-                        sample_rate=8000,
-                        encoding="linear16",
-                    )
-                    logger.info("Created LiveOptions with speaker diarization enabled")
-                except TypeError:
-                    # If those parameters aren't supported, use basic options
-                    logger.warning("sample_rate/encoding not supported in LiveOptions, using basic options")
-                    try:
-                        options = LiveOptions(
-                            model="nova-2",
-                            language="en-US",
-                            smart_format=True,
-                            interim_results=True,
-                            utterance_end_ms=1000,
-                            vad_events=True,
-                            diarize=True,  # Enable speaker diarization
-                        )
-                        logger.info("Created LiveOptions with speaker diarization (basic options)")
-                    except TypeError:
-                        # Fallback if diarize is not supported
-                        logger.warning("diarize not supported in LiveOptions, using basic options without diarization")
-                        options = LiveOptions(
-                            model="nova-2",
-                            language="en-US",
-                            smart_format=True,
-                            interim_results=True,
-                            utterance_end_ms=1000,
-                            vad_events=True,
-                        )
-                        logger.info("Created LiveOptions with basic options (no diarization)")
-
-                if not deepgram_connection.start(options):
+                options = _LIVE_OPTIONS
+                # start() does a blocking WebSocket handshake; keep it off the event loop
+                # so a burst of new calls doesn't stall audio for the ones already running
+                if not await self.loop.run_in_executor(self.deepgram_control_executor, deepgram_connection.start, options):
                     logger.error("Failed to start Deepgram connection")
                     await websocket.close(code=1011, reason="Failed to start transcription")
                     return
@@ -269,220 +387,434 @@ class MediaStreamHandler:
                 await websocket.close(code=1011, reason="Failed to start transcription")
                 return
 
-            # Store connection info
-            # Track speaker mapping: Deepgram speaker IDs -> 'va' or 'prospect'
-            # We'll use a simple heuristic: first speaker is usually the VA (caller)
-            speaker_mapping = {}  # Maps Deepgram speaker ID to 'va' or 'prospect'
-            next_speaker_index = 0  # Track which speaker index to assign next
-
-            connection_info = {
-                'websocket': websocket,
-                'deepgram': deepgram_connection,
-                'twilio_call_sid': twilio_call_sid,
-                'call_session_id_ref': call_session_id_ref,
-                'media_count': 0,  # Track number of media packets received
-                'speaker_mapping': speaker_mapping,
-                'next_speaker_index': next_speaker_index,
-                'track_to_speaker': {'inbound': 'va', 'outbound': 'prospect'},  # Direct mapping: track -> speaker
-                'current_track': None,  # Track which track we're currently receiving audio from
-                'track_history': [],  # List of (timestamp, track) tuples to help match transcripts to tracks
-            }
-
-            if call_session_id_ref[0]:
-                self.active_streams[call_session_id_ref[0]] = connection_info
+            connection_info.deepgram = deepgram_connection
+            connection_info.twilio_call_sid = twilio_call_sid
+
+            # Transcripts are queued per call and posted to Laravel by a single drain task
+            transcript_queue = asyncio.Queue(maxsize=500)
+            connection_info.transcript_queue = transcript_queue
+            connection_info.drain_task = asyncio.create_task(self.drain_transcripts(connection_info, transcript_queue))
+
+            # Audio is queued and sent to Deepgram by a per-call feed task, so a slow
+            # Deepgram socket only stalls this call and never the event loop
+            audio_queue = asyncio.Queue(maxsize=200)
+            connection_info.audio_queue = audio_queue
+            connection_info.feed_task = asyncio.create_task(self.feed_deepgram(deepgram_connection, audio_queue))
+
+            # Packet counts are logged periodically rather than from the media path
+            connection_info.stats_task = asyncio.create_task(self.report_media_stats(connection_info))
+
+            if connection_info.call_session_id:
+                self.register_stream(connection_info.call_session_id, connection_info)
 
             # Forward audio from Twilio to Deepgram
-            # Also watch for 'start' event which may contain parameters
-            async for message in websocket:
-                if isinstance(message, str):
-                    try:
-                        data = json.loads(message)
-                        event = data.get('event')
-
-                        # Check for 'start' event which contains stream metadata
-                        if event == 'start':
-                            logger.info(f"Received 'start' event: {json.dumps(data, indent=2)}")
-                            # Parameters might be in the 'start' event
-                            if not call_session_id_ref[0]:
-                                # Try to extract from start event
-                                start_data = data.get('start', {})
-
-                                # Check customParameters first (where Twilio sends <Parameter> values)
-                                custom_params = start_data.get('customParameters', {})
-                                call_session_id_ref[0] = (
-                                    custom_params.get('callSessionId') or
-                                    custom_params.get('callSession') or
-                                    start_data.get('callSessionId') or
-                                    start_data.get('callSession') or
-                                    data.get('callSessionId') or
-                                    data.get('callSession')
-                                )
-
-                                # Extract Twilio call SID from start event
-                                twilio_call_sid = (
-                                    twilio_call_sid or
-                                    start_data.get('callSid') or
-                                    data.get('callSid') or
-                                    data.get('twilioCallSid')
-                                )
-
-                                if call_session_id_ref[0]:
-                                    logger.info(f"Found call_session_id in 'start' event: {call_session_id_ref[0]}")
-                                    logger.info(f"Twilio Call SID: {twilio_call_sid}")
-                                    # Update connection info
-                                    connection_info['twilio_call_sid'] = twilio_call_sid
-                                    self.active_streams[call_session_id_ref[0]] = connection_info
-                                    logger.info(f"Processing stream for call session: {call_session_id_ref[0]}")
-                                else:
-                                    logger.warning("Still no call_session_id found in 'start' event")
-                                    logger.warning(f"Checked customParameters: {custom_params}")
-                                    logger.warning(f"Checked start_data keys: {list(start_data.keys())}")
-
-                        if event == 'media':
-                            # Decode mu-law audio from Twilio
-                            connection_info['media_count'] = connection_info.get('media_count', 0) + 1
-                            payload = data.get('media', {}).get('payload')
-
-                            # Check if this is inbound or outbound audio (Twilio provides track parameter)
-                            media_info = data.get('media', {})
-                            track = media_info.get('track', 'unknown')  # 'inbound' or 'outbound'
-
-                            # Update current track and track history for speaker mapping
-                            connection_info['current_track'] = track
-
-                            # Store track history with timestamp (limit to last 100 entries to avoid memory issues)
-                            import time
-                            current_time = time.time()
-                            track_history = connection_info.get('track_history', [])
-                            track_history.append((current_time, track))
-                            # Keep only last 100 entries (roughly last 10 seconds at 10 packets/second)
-                            if len(track_history) > 100:
-                                track_history = track_history[-100:]
-                            connection_info['track_history'] = track_history
-
-                            if payload:
-                                try:
-                                    # Convert base64 mu-law to PCM
-                                    audio_data = base64.b64decode(payload)
-                                    # Deepgram expects PCM16 audio
-                                    pcm_audio = self.mulaw_to_pcm(audio_data)
-                                    # Send to Deepgram
-                                    if deepgram_connection:
-                                        deepgram_connection.send(pcm_audio)
-                                        # Log every 100th packet to avoid spam, including track info
-                                        if connection_info['media_count'] % 100 == 0:
-                                            logger.info(f"Sent {connection_info['media_count']} audio packets to Deepgram (track: {track}, latest: {len(pcm_audio)} bytes)")
-
-                                        # Track which track we're receiving audio from
-                                        if 'track_counts' not in connection_info:
-                                            connection_info['track_counts'] = {'inbound': 0, 'outbound': 0, 'unknown': 0}
-                                        connection_info['track_counts'][track] = connection_info['track_counts'].get(track, 0) + 1
-
-                                        # Warn if we're only receiving one track after many packets
-                                        if connection_info['media_count'] >= 200:
-                                            track_counts = connection_info.get('track_counts', {})
-                                            inbound_count = track_counts.get('inbound', 0)
-                                            outbound_count = track_counts.get('outbound', 0)
-                                            if inbound_count == 0 and outbound_count > 0:
-                                                logger.warning(f"WARNING: Only receiving 'outbound' audio track after {connection_info['media_count']} packets. Check Twilio Media Stream configuration.")
-                                            elif outbound_count == 0 and inbound_count > 0:
-                                                logger.warning(f"WARNING: Only receiving 'inbound' audio track after {connection_info['media_count']} packets. Check Twilio Media Stream configuration.")
-                                            elif inbound_count > 0 and outbound_count > 0:
-                                                logger.info(f"✓ Receiving audio from both tracks: inbound={inbound_count}, outbound={outbound_count}")
-                                    else:
-                                        logger.warning("Deepgram connection not available when trying to send audio")
-                                except Exception as e:
-                                    logger.error(f"Error processing audio data: {e}", exc_info=True)
-                                    continue
-                            else:
-                                logger.debug("Media event received but no payload")
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"Invalid JSON received: {e}")
-                        continue
-                    except Exception as e:
-                        logger.error(f"Error processing message: {e}")
+            # Also watch for 'start' event which may contain parameters.
+            # Frames are read as raw bytes (decode=False) and handed straight to orjson,
+            # skipping the UTF-8 decode of every text frame.
+            while True:
+                message = await websocket.recv(decode=False)
+
+                try:
+                    # Media frames are nearly all of the traffic: pull the payload and track
+                    # out with regexes instead of parsing the whole JSON document. Anything
+                    # unexpected falls through to the full parse below.
+                    if message.startswith(_MEDIA_EVENT_PREFIX):
+                        payload_match = _MEDIA_PAYLOAD_RE.search(message)
+                        if payload_match:
+                            track_match = _MEDIA_TRACK_RE.search(message)
+                            track = track_match.group(1).decode(errors='replace') if track_match else 'unknown'
+                            self.handle_media(connection_info, deepgram_connection, payload_match.group(1), track)
+                            continue
+                    elif message.startswith(_EVENT_PREFIX) and not message.startswith(_HANDLED_EVENT_PREFIXES):
                         continue
+                    data = orjson.loads(message)
+                    event = data.get('event')
+
+                    # Check for 'start' event which contains stream metadata
+                    if event == 'start':
+                        logger.info("Received 'start' event")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(f"'start' event payload: {orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()}")
+                        # Parameters might be in the 'start' event
+                        if not connection_info.call_session_id:
+                            # Try to extract from start event
+                            start_data = data.get('start', {})
+
+                            # Check customParameters first (where Twilio sends <Parameter> values)
+                            custom_params = start_data.get('customParameters', {})
+                            connection_info.call_session_id = (
+                                custom_params.get('callSessionId') or
+                                custom_params.get('callSession') or
+                                start_data.get('callSessionId') or
+                                start_data.get('callSession') or
+                                data.get('callSessionId') or
+                                data.get('callSession')
+                            )
+
+                            # Extract Twilio call SID from start event
+                            twilio_call_sid = (
+                                twilio_call_sid or
+                                start_data.get('callSid') or
+                                data.get('callSid') or
+                                data.get('twilioCallSid')
+                            )
+
+                            if connection_info.call_session_id:
+                                connection_info.call_session_id = str(connection_info.call_session_id)
+                                logger.info(f"Found call_session_id in 'start' event: {connection_info.call_session_id}")
+                                logger.info(f"Twilio Call SID: {twilio_call_sid}")
+                                # Update connection info
+                                connection_info.twilio_call_sid = twilio_call_sid
+                                self.register_stream(connection_info.call_session_id, connection_info)
+                                logger.info(f"Processing stream for call session: {connection_info.call_session_id}")
+                            else:
+                                logger.warning("Still no call_session_id found in 'start' event")
+                                logger.warning(f"Checked customParameters: {custom_params}")
+                                logger.warning(f"Checked start_data keys: {list(start_data.keys())}")
+
+                    if event == 'media':
+                        media_info = data.get('media', {})
+                        # Check if this is inbound or outbound audio (Twilio provides track parameter)
+                        track = media_info.get('track', 'unknown')  # 'inbound' or 'outbound'
+                        self.handle_media(connection_info, deepgram_connection, media_info.get('payload'), track)
+                except orjson.JSONDecodeError as e:
+                    logger.warning("Invalid JSON received: %s", e)
+                    continue
+                except Exception as e:
+                    logger.error("Error processing message: %s", e)
+                    continue
 
         except websockets.exceptions.ConnectionClosedOK:
-            logger.info(f"Twilio connection closed gracefully for call {call_session_id_ref[0]}")
+            logger.info(f"Twilio connection closed gracefully for call {connection_info.call_session_id}")
         except websockets.exceptions.ConnectionClosed as e:
-            logger.warning(f"Twilio connection closed unexpectedly for call {call_session_id_ref[0]}: {e.code} - {e.reason}")
+            logger.warning(f"Twilio connection closed unexpectedly for call {connection_info.call_session_id}: {e.code} - {e.reason}")
         except Exception as e:
-            logger.error(f"Error handling stream for call {call_session_id_ref[0]}: {e}", exc_info=True)
+            logger.error(f"Error handling stream for call {connection_info.call_session_id}: {e}", exc_info=True)
         finally:
-            final_call_session_id = call_session_id_ref[0]
+            final_call_session_id = connection_info.call_session_id
+
+            if connection_info.stats_task:
+                connection_info.stats_task.cancel()
+
+            if connection_info.feed_task:
+                # Send any audio still buffered or queued before finishing the Deepgram stream
+                self.flush_audio(connection_info)
+                await connection_info.audio_queue.put(None)
+                try:
+                    await connection_info.feed_task
+                except Exception as e:
+                    logger.error(f"Error flushing audio for call {final_call_session_id}: {e}")
 
             if deepgram_connection:
                 try:
-                    deepgram_connection.finish()
+                    await self.loop.run_in_executor(self.deepgram_control_executor, deepgram_connection.finish)
                     logger.info(f"Deepgram connection finished for call {final_call_session_id}")
                 except Exception as e:
                     logger.error(f"Error closing Deepgram connection for call {final_call_session_id}: {e}")
 
+            if transcript_consumer:
+                # Deepgram is finished, so no more results will be appended
+                transcript_events.append(None)
+                transcript_wakeup.set()
+                try:
+                    await transcript_consumer
+                except Exception as e:
+                    logger.error(f"Error processing final transcripts for call {final_call_session_id}: {e}")
+
+            if connection_info.drain_task:
+                # Let the drain task flush what's already queued, then stop.
+                # Transcripts arriving after this point are posted directly.
+                transcript_queue, connection_info.transcript_queue = connection_info.transcript_queue, None
+                await transcript_queue.put(None)
+                try:
+                    await connection_info.drain_task
+                except Exception as e:
+                    logger.error(f"Error flushing transcripts for call {final_call_session_id}: {e}")
+
             if final_call_session_id and final_call_session_id in self.active_streams:
-                self.active_streams.pop(final_call_session_id, None)
+                self.unregister_stream(final_call_session_id)
                 logger.info(f"Cleaned up stream for call session {final_call_session_id}")
 
+    def handle_media(self, connection_info, deepgram_connection, payload, track):
+        """Decode one Twilio media payload and buffer it for Deepgram"""
+        # Decode mu-law audio from Twilio
+        connection_info.media_count += 1
+
+        # Update current track and track history for speaker mapping
+        connection_info.current_track = track
+
+        # Store track history with timestamp (limit to last 100 entries to avoid memory issues)
+        current_time = time.time()
+        track_history = connection_info.track_history
+        track_history.append((current_time, track))
+        # Keep only last 100 entries (roughly last 10 seconds at 10 packets/second)
+        if len(track_history) > 100:
+            track_history = track_history[-100:]
+        connection_info.track_history = track_history
+
+        if payload:
+            try:
+                # Convert base64 mu-law to PCM16, which Deepgram expects
+                pcm_audio = self.decode_frame(payload)
+                # Send to Deepgram
+                if deepgram_connection:
+                    self.buffer_audio(connection_info, pcm_audio)
+
+                    # Track which track we're receiving audio from
+                    track_counts = connection_info.track_counts
+                    track_counts[track] = track_counts.get(track, 0) + 1
+                else:
+                    logger.warning("Deepgram connection not available when trying to send audio")
+            except Exception as e:
+                logger.error("Error processing audio data: %s", e, exc_info=True)
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Media event received but no payload")
+
+    async def report_media_stats(self, connection_info):
+        """Periodically log a call's media packet counts and warn on a missing track"""
+        while True:
+            await asyncio.sleep(MEDIA_STATS_INTERVAL)
+            media_count = connection_info.media_count
+            track_counts = connection_info.track_counts
+            inbound_count = track_counts.get('inbound', 0)
+            outbound_count = track_counts.get('outbound', 0)
+            logger.info("Sent %d audio packets to Deepgram for call %s (inbound=%d, outbound=%d)",
+                        media_count, connection_info.call_session_id, inbound_count, outbound_count)
+
+            # Warn if we're only receiving one track after many packets
+            if media_count >= 200:
+                if inbound_count == 0 and outbound_count > 0:
+                    logger.warning(f"WARNING: Only receiving 'outbound' audio track after {media_count} packets. Check Twilio Media Stream configuration.")
+                elif outbound_count == 0 and inbound_count > 0:
+                    logger.warning(f"WARNING: Only receiving 'inbound' audio track after {media_count} packets. Check Twilio Media Stream configuration.")
+
+    def register_stream(self, call_session_id, connection_info):
+        """Track a call's state once its call_session_id is known"""
+        self.active_streams[call_session_id] = connection_info
+        self.deepgram_connections[call_session_id] = connection_info.deepgram
+
+    def unregister_stream(self, call_session_id):
+        """Forget a call's state"""
+        self.deepgram_connections.pop(call_session_id, None)
+        return self.active_streams.pop(call_session_id, None)
+
+    def buffer_audio(self, connection_info, pcm_audio):
+        """Accumulate PCM audio and queue it for Deepgram in larger chunks"""
+        audio_buffer = connection_info.audio_buffer
+        audio_buffer.extend(pcm_audio)
+        if len(audio_buffer) >= DEEPGRAM_CHUNK_BYTES:
+            self.flush_audio(connection_info)
+        elif connection_info.flush_timer is None:
+            # Bound the latency of a partial chunk even if Twilio stops sending frames
+            connection_info.flush_timer = self.loop.call_later(
+                DEEPGRAM_CHUNK_MAX_MS / 1000, self.flush_audio, connection_info
+            )
+
+    def flush_audio(self, connection_info):
+        """Queue whatever PCM audio is buffered for the call"""
+        audio_buffer = connection_info.audio_buffer
+        if connection_info.flush_timer is not None:
+            connection_info.flush_timer.cancel()
+            connection_info.flush_timer = None
+        if audio_buffer:
+            self.queue_audio(connection_info, bytes(audio_buffer))
+            audio_buffer.clear()
+
+    def queue_audio(self, connection_info, pcm_audio):
+        """Queue PCM audio for the call's Deepgram feed task"""
+        audio_queue = connection_info.audio_queue
+        if audio_queue.full():
+            # Deepgram is falling behind; drop the oldest chunk rather than block the reader
+            audio_queue.get_nowait()
+            connection_info.dropped_audio += 1
+            if connection_info.dropped_audio % 50 == 1:
+                logger.warning("Deepgram backpressure for call %s: dropped %d audio packets",
+                               connection_info.call_session_id, connection_info.dropped_audio)
+        audio_queue.put_nowait(pcm_audio)
+
+    async def feed_deepgram(self, deepgram_connection, audio_queue):
+        """Send queued PCM audio to Deepgram until a None sentinel is received"""
+        loop = self.loop
+        while True:
+            pcm_audio = await audio_queue.get()
+            if pcm_audio is None:
+                break
+            try:
+                # LiveClient.send is a blocking socket write; keep it off the event loop
+                await loop.run_in_executor(self.deepgram_send_executor, deepgram_connection.send, pcm_audio)
+            except Exception as e:
+                logger.error(f"Error sending audio to Deepgram: {e}")
+
+    def tune_socket(self, websocket):
+        """Fix the kernel receive buffer size on an accepted Twilio socket"""
+        # Twilio only sends to us, so the receive side is the one that matters.
+        # Setting SO_RCVBUF pins the buffer at this size and turns off the
+        # kernel's receive-buffer autotuning for this socket.
+        try:
+            sock = websocket.transport.get_extra_info('socket')
+            if sock is None:
+                return
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        except (AttributeError, OSError) as e:
+            logger.warning(f"Could not set socket options: {e}")
+
+    def decode_frame(self, payload):
+        """Decode a base64 mu-law Twilio payload to PCM16"""
+        # a2b_base64 is the C decoder b64decode wraps; Twilio payloads are standard alphabet
+        return self.mulaw_to_pcm(a2b_base64(payload))
+
     def mulaw_to_pcm(self, mulaw_data):
         """Convert mu-law audio to PCM16"""
-        # Mu-law to linear conversion
-        mulaw_table = [
-            -32124, -31100, -30076, -29052, -28028, -27004, -25980, -24956,
-            -23932, -22908, -21884, -20860, -19836, -18812, -17788, -16764,
-            -15996, -15484, -14972, -14460, -13948, -13436, -12924, -12412,
-            -11900, -11388, -10876, -10364, -9852, -9340, -8828, -8316,
-            -7932, -7676, -7420, -7164, -6908, -6652, -6396, -6140,
-            -5884, -5628, -5372, -5116, -4860, -4604, -4348, -4092,
-            -3900, -3772, -3644, -3516, -3388, -3260, -3132, -3004,
-            -2876, -2748, -2620, -2492, -2364, -2236, -2108, -1980,
-            -1884, -1820, -1756, -1692, -1628, -1564, -1500, -1436,
-            -1372, -1308, -1244, -1180, -1116, -1052, -988, -924,
-            -876, -844, -812, -780, -748, -716, -684, -652,
-            -620, -588, -556, -524, -492, -460, -428, -396,
-            -372, -356, -340, -324, -308, -292, -276, -260,
-            -244, -228, -212, -196, -180, -164, -148, -132,
-            -120, -112, -104, -96, -88, -80, -72, -64,
-            -56, -48, -40, -32, -24, -16, -8, 0,
-            32124, 31100, 30076, 29052, 28028, 27004, 25980, 24956,
-            23932, 22908, 21884, 20860, 19836, 18812, 17788, 16764,
-            15996, 15484, 14972, 14460, 13948, 13436, 12924, 12412,
-            11900, 11388, 10876, 10364, 9852, 9340, 8828, 8316,
-            7932, 7676, 7420, 7164, 6908, 6652, 6396, 6140,
-            5884, 5628, 5372, 5116, 4860, 4604, 4348, 4092,
-            3900, 3772, 3644, 3516, 3388, 3260, 3132, 3004,
-            2876, 2748, 2620, 2492, 2364, 2236, 2108, 1980,
-            1884, 1820, 1756, 1692, 1628, 1564, 1500, 1436,
-            1372, 1308, 1244, 1180, 1116, 1052, 988, 924,
-            876, 844, 812, 780, 748, 716, 684, 652,
-            620, 588, 556, 524, 492, 460, 428, 396,
-            372, 356, 340, 324, 308, 292, 276, 260,
-            244, 228, 212, 196, 180, 164, 148, 132,
-            120, 112, 104, 96, 88, 80, 72, 64,
-            56, 48, 40, 32, 24, 16, 8, 0
-        ]
-
-        pcm_data = bytearray()
-        for byte in mulaw_data:
-            pcm_value = mulaw_table[byte]
-            # Convert to 16-bit signed integer (little-endian)
-            pcm_data.extend(pcm_value.to_bytes(2, byteorder='little', signed=True))
-
-        return bytes(pcm_data)
+        # ulaw2lin writes native-endian samples; Deepgram expects little-endian
+        pcm = audioop.ulaw2lin(mulaw_data, 2)
+        return audioop.byteswap(pcm, 2) if _BIG_ENDIAN_HOST else pcm
+
+    async def startup(self):
+        """Create the shared HTTP session before accepting connections"""
+        self.loop = asyncio.get_running_loop()
+        await self.get_http_session()
 
     async def get_http_session(self):
         """Get or create a reusable HTTP session"""
         if self.http_session is None or self.http_session.closed:
+            # One pooled, keep-alive session for all calls and transcripts so we
+            # don't pay a TCP + TLS handshake per POST to Laravel
             timeout = aiohttp.ClientTimeout(total=10)
-            self.http_session = aiohttp.ClientSession(timeout=timeout)
+            # Laravel is the only host, so limit_per_host=64 is the effective cap on concurrent
+            # POSTs, which come from the per-call drain tasks. limit=200 only bounds the pool
+            # overall. The DNS answer is cached well past aiohttp's 10s default.
+            connector = aiohttp.TCPConnector(limit=200, limit_per_host=64, keepalive_timeout=75, ttl_dns_cache=300)
+            self.http_session = aiohttp.ClientSession(timeout=timeout, connector=connector, headers=_LARAVEL_HEADERS)
         return self.http_session
 
     def on_deepgram_open(self, *args, **kwargs):
         """Handle Deepgram connection open"""
         logger.info(f"Deepgram connection opened - args: {args}, kwargs: {kwargs}")
 
-    async def on_deepgram_transcript(self, *args, call_session_id=None, **kwargs):
+    def extract_is_final_fallback(self, transcript_result):
+        """Probe non-standard Deepgram result shapes for the is_final flag"""
+        try:
+            if hasattr(transcript_result, 'channel') and hasattr(transcript_result.channel, 'alternatives'):
+                if transcript_result.channel.alternatives and len(transcript_result.channel.alternatives) > 0:
+                    alt = transcript_result.channel.alternatives[0]
+                    if hasattr(alt, 'is_final'):
+                        return bool(getattr(alt, 'is_final', False))
+        except Exception as e:
+            logger.debug(f"Could not determine is_final status: {e}")
+        return False
+
+    def extract_timestamp_fallback(self, transcript_result):
+        """Probe non-standard Deepgram result shapes for the start time"""
+        timestamp = 0.0
+        try:
+            # Try to get start time from the result object
+            if hasattr(transcript_result, 'start'):
+                start_attr = getattr(transcript_result, 'start', None)
+                # Check if it's a numeric value, not a method
+                if start_attr is not None and not callable(start_attr):
+                    timestamp = float(start_attr)
+            elif hasattr(transcript_result, 'start_time'):
+                timestamp = float(getattr(transcript_result, 'start_time', 0.0))
+            elif hasattr(transcript_result, 'message_ts'):
+                timestamp = float(getattr(transcript_result, 'message_ts', 0.0))
+            elif hasattr(transcript_result, 'channel') and hasattr(transcript_result.channel, 'alternatives'):
+                if transcript_result.channel.alternatives and len(transcript_result.channel.alternatives) > 0:
+                    alt = transcript_result.channel.alternatives[0]
+                    if hasattr(alt, 'start'):
+                        alt_start = getattr(alt, 'start', None)
+                        if alt_start is not None and not callable(alt_start):
+                            timestamp = float(alt_start)
+                    elif hasattr(alt, 'words') and alt.words and len(alt.words) > 0:
+                        # Use the start time of the first word
+                        first_word = alt.words[0]
+                        if hasattr(first_word, 'start'):
+                            word_start = getattr(first_word, 'start', None)
+                            if word_start is not None:
+                                timestamp = float(word_start)
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.debug(f"Could not extract timestamp: {e}, using 0.0")
+            timestamp = 0.0
+        return timestamp
+
+    def extract_sentence_fallback(self, transcript_result):
+        """Probe non-standard Deepgram result shapes for the transcript text"""
+        sentence = None
+
+        # Try to extract from channel.alternatives (standard Deepgram structure)
+        if hasattr(transcript_result, 'channel') and hasattr(transcript_result.channel, 'alternatives'):
+            if transcript_result.channel.alternatives and len(transcript_result.channel.alternatives) > 0:
+                alt = transcript_result.channel.alternatives[0]
+                # Try multiple ways to get transcript
+                if hasattr(alt, 'transcript'):
+                    sentence = getattr(alt, 'transcript', None)
+                elif hasattr(alt, 'text'):
+                    sentence = getattr(alt, 'text', None)
+                elif hasattr(alt, 'transcript_text'):
+                    sentence = getattr(alt, 'transcript_text', None)
+
+                if sentence:
+                    logger.debug("Extracted transcript from channel.alternatives[0]: %s", sentence[:100])
+
+        # Try alternative paths
+        if not sentence:
+            if hasattr(transcript_result, 'alternatives') and transcript_result.alternatives:
+                alt = transcript_result.alternatives[0]
+                if hasattr(alt, 'transcript'):
+                    sentence = getattr(alt, 'transcript', None)
+                elif hasattr(alt, 'text'):
+                    sentence = getattr(alt, 'text', None)
+                if sentence:
+                    logger.debug("Extracted transcript from alternatives[0]: %s", sentence[:100])
+
+        if not sentence:
+            if hasattr(transcript_result, 'transcript'):
+                sentence = getattr(transcript_result, 'transcript', None)
+            elif hasattr(transcript_result, 'text'):
+                sentence = getattr(transcript_result, 'text', None)
+            if sentence:
+                logger.debug("Extracted transcript from transcript attribute: %s", sentence[:100])
+
+        # Try extracting from words if transcript is not available directly
+        if not sentence or not sentence.strip():
+            try:
+                if hasattr(transcript_result, 'channel') and hasattr(transcript_result.channel, 'alternatives'):
+                    if transcript_result.channel.alternatives and len(transcript_result.channel.alternatives) > 0:
+                        alt = transcript_result.channel.alternatives[0]
+                        if hasattr(alt, 'words') and alt.words and len(alt.words) > 0:
+                            # Build transcript from words
+                            word_texts = []
+                            for word in alt.words:
+                                if hasattr(word, 'word'):
+                                    word_texts.append(getattr(word, 'word', ''))
+                                elif hasattr(word, 'text'):
+                                    word_texts.append(getattr(word, 'text', ''))
+                            if word_texts:
+                                sentence = ' '.join(word_texts).strip()
+                                logger.debug("Built transcript from words: %s", sentence[:100])
+            except Exception as e:
+                logger.debug(f"Error building transcript from words: {e}")
+
+        return sentence
+
+    async def consume_transcripts(self, connection_info, transcript_events, transcript_wakeup):
+        """Process Deepgram results queued by the SDK thread until a None sentinel"""
+        while True:
+            await transcript_wakeup.wait()
+            transcript_wakeup.clear()
+            while transcript_events:
+                item = transcript_events.popleft()
+                if item is None:
+                    return
+                args, kwargs = item
+                current_id = connection_info.call_session_id
+                if current_id:
+                    await self.on_deepgram_transcript(*args, call_session_id=current_id, connection_info=connection_info, **kwargs)
+                else:
+                    logger.warning("Received transcript but no call_session_id yet")
+
+    async def on_deepgram_transcript(self, *args, call_session_id=None, connection_info, **kwargs):
         """Handle Deepgram transcript events"""
-        logger.info(f"Deepgram transcript event received for call_session_id: {call_session_id}")
+        logger.info("Deepgram transcript event received for call_session_id: %s", call_session_id)
 
         # The transcript result is passed in kwargs['result'], not args[0]
         # args[0] is the LiveClient object
@@ -494,23 +826,14 @@ class MediaStreamHandler:
 
         try:
             # Log the result structure for debugging (only log first few times to avoid spam)
-            if not hasattr(self, '_transcript_log_count'):
-                self._transcript_log_count = 0
             self._transcript_log_count += 1
 
-            # Check if this is a final result or interim result
-            is_final = False
+            # Check if this is a final result or interim result. Deepgram's LiveResultResponse
+            # carries is_final at the top level; only probe elsewhere when it doesn't.
             try:
-                # Check multiple possible locations for is_final flag
-                if hasattr(transcript_result, 'is_final'):
-                    is_final = bool(getattr(transcript_result, 'is_final', False))
-                elif hasattr(transcript_result, 'channel') and hasattr(transcript_result.channel, 'alternatives'):
-                    if transcript_result.channel.alternatives and len(transcript_result.channel.alternatives) > 0:
-                        alt = transcript_result.channel.alternatives[0]
-                        if hasattr(alt, 'is_final'):
-                            is_final = bool(getattr(alt, 'is_final', False))
-            except Exception as e:
-                logger.debug(f"Could not determine is_final status: {e}")
+                is_final = bool(transcript_result.is_final)
+            except AttributeError:
+                is_final = self.extract_is_final_fallback(transcript_result)
 
             # Skip interim results - only send final transcripts to Laravel
             if not is_final:
@@ -521,62 +844,18 @@ class MediaStreamHandler:
                 if self._transcript_log_count <= 3:
                     logger.info(f"Deepgram transcript_result attributes: {[attr for attr in dir(transcript_result) if not attr.startswith('_')]}")
 
-            # Extract transcript text from the result object
-            sentence = None
-
-            # Try to extract from channel.alternatives (standard Deepgram structure)
-            if hasattr(transcript_result, 'channel') and hasattr(transcript_result.channel, 'alternatives'):
-                if transcript_result.channel.alternatives and len(transcript_result.channel.alternatives) > 0:
-                    alt = transcript_result.channel.alternatives[0]
-                    # Try multiple ways to get transcript
-                    if hasattr(alt, 'transcript'):
-                        sentence = getattr(alt, 'transcript', None)
-                    elif hasattr(alt, 'text'):
-                        sentence = getattr(alt, 'text', None)
-                    elif hasattr(alt, 'transcript_text'):
-                        sentence = getattr(alt, 'transcript_text', None)
-
-                    if sentence:
-                        logger.debug(f"Extracted transcript from channel.alternatives[0]: {sentence[:100] if len(sentence) > 100 else sentence}")
-
-            # Try alternative paths
-            if not sentence:
-                if hasattr(transcript_result, 'alternatives') and transcript_result.alternatives:
-                    alt = transcript_result.alternatives[0]
-                    if hasattr(alt, 'transcript'):
-                        sentence = getattr(alt, 'transcript', None)
-                    elif hasattr(alt, 'text'):
-                        sentence = getattr(alt, 'text', None)
-                    if sentence:
-                        logger.debug(f"Extracted transcript from alternatives[0]: {sentence[:100] if len(sentence) > 100 else sentence}")
-
-            if not sentence:
-                if hasattr(transcript_result, 'transcript'):
-                    sentence = getattr(transcript_result, 'transcript', None)
-                elif hasattr(transcript_result, 'text'):
-                    sentence = getattr(transcript_result, 'text', None)
-                if sentence:
-                    logger.debug(f"Extracted transcript from transcript attribute: {sentence[:100] if len(sentence) > 100 else sentence}")
-
-            # Try extracting from words if transcript is not available directly
-            if not sentence or not sentence.strip():
-                try:
-                    if hasattr(transcript_result, 'channel') and hasattr(transcript_result.channel, 'alternatives'):
-                        if transcript_result.channel.alternatives and len(transcript_result.channel.alternatives) > 0:
-                            alt = transcript_result.channel.alternatives[0]
-                            if hasattr(alt, 'words') and alt.words and len(alt.words) > 0:
-                                # Build transcript from words
-                                word_texts = []
-                                for word in alt.words:
-                                    if hasattr(word, 'word'):
-                                        word_texts.append(getattr(word, 'word', ''))
-                                    elif hasattr(word, 'text'):
-                                        word_texts.append(getattr(word, 'text', ''))
-                                if word_texts:
-                                    sentence = ' '.join(word_texts).strip()
-                                    logger.debug(f"Built transcript from words: {sentence[:100] if len(sentence) > 100 else sentence}")
-                except Exception as e:
-                    logger.debug(f"Error building transcript from words: {e}")
+            # Extract transcript text from the result object. Standard Deepgram results
+            # have channel.alternatives[0].transcript; walk it once and only fall back to
+            # probing other shapes when that structure is missing.
+            try:
+                alternatives = transcript_result.channel.alternatives
+                sentence = alternatives[0].transcript if alternatives else ''
+            except (AttributeError, IndexError):
+                sentence = self.extract_sentence_fallback(transcript_result)
+            else:
+                if not sentence or not sentence.strip():
+                    # Silence: a well-formed result with no words in it
+                    return
 
             # Skip empty transcripts, but log more details for debugging
             if not sentence or not sentence.strip():
@@ -593,42 +872,12 @@ class MediaStreamHandler:
                                 logger.warning(f"Alternative structure: {[attr for attr in dir(alt) if not attr.startswith('_')]}")
                 return
 
-            # Determine speaker using Twilio track information (more reliable than Deepgram speaker IDs)
-            # Get connection info to access track mapping
-            connection_info = None
-            if call_session_id and call_session_id in self.active_streams:
-                connection_info = self.active_streams[call_session_id]
-
-            # Calculate timestamp (relative to call start) - do this first as we might use it for track matching
-            timestamp = 0.0
+            # Calculate timestamp (relative to call start) - do this first as we might use it for track matching.
+            # Deepgram's LiveResultResponse carries a numeric start; only probe elsewhere when it doesn't.
             try:
-                # Try to get start time from the result object
-                if hasattr(transcript_result, 'start'):
-                    start_attr = getattr(transcript_result, 'start', None)
-                    # Check if it's a numeric value, not a method
-                    if start_attr is not None and not callable(start_attr):
-                        timestamp = float(start_attr)
-                elif hasattr(transcript_result, 'start_time'):
-                    timestamp = float(getattr(transcript_result, 'start_time', 0.0))
-                elif hasattr(transcript_result, 'message_ts'):
-                    timestamp = float(getattr(transcript_result, 'message_ts', 0.0))
-                elif hasattr(transcript_result, 'channel') and hasattr(transcript_result.channel, 'alternatives'):
-                    if transcript_result.channel.alternatives and len(transcript_result.channel.alternatives) > 0:
-                        alt = transcript_result.channel.alternatives[0]
-                        if hasattr(alt, 'start'):
-                            alt_start = getattr(alt, 'start', None)
-                            if alt_start is not None and not callable(alt_start):
-                                timestamp = float(alt_start)
-                        elif hasattr(alt, 'words') and alt.words and len(alt.words) > 0:
-                            # Use the start time of the first word
-                            first_word = alt.words[0]
-                            if hasattr(first_word, 'start'):
-                                word_start = getattr(first_word, 'start', None)
-                                if word_start is not None:
-                                    timestamp = float(word_start)
-            except (ValueError, TypeError, AttributeError) as e:
-                logger.debug(f"Could not extract timestamp: {e}, using 0.0")
-                timestamp = 0.0
+                timestamp = float(transcript_result.start)
+            except (AttributeError, TypeError, ValueError):
+                timestamp = self.extract_timestamp_fallback(transcript_result)
 
             # Use track-based speaker mapping instead of Deepgram speaker IDs
             # This is more reliable because we know:
@@ -636,95 +885,178 @@ class MediaStreamHandler:
             # - outbound track = Prospect (person being called)
             speaker = 'prospect'  # Default fallback
 
-            if connection_info:
-                track_to_speaker = connection_info.get('track_to_speaker', {'inbound': 'va', 'outbound': 'prospect'})
+            track_to_speaker = connection_info.track_to_speaker
 
-                # Use current track (most reliable since transcripts come shortly after audio packets)
-                current_track = connection_info.get('current_track')
+            # Use current track (most reliable since transcripts come shortly after audio packets)
+            current_track = connection_info.current_track
 
-                if current_track and current_track in track_to_speaker:
-                    speaker = track_to_speaker[current_track]
-                    logger.info(f"Using current track for speaker mapping: track={current_track} -> speaker={speaker} (timestamp={timestamp:.2f})")
-                else:
-                    # Fallback: use the most recent track from history
-                    track_history = connection_info.get('track_history', [])
-                    if track_history:
-                        # Get the most recent track
-                        _, most_recent_track = track_history[-1]
-                        if most_recent_track in track_to_speaker:
-                            speaker = track_to_speaker[most_recent_track]
-                            logger.info(f"Using track history for speaker mapping: track={most_recent_track} -> speaker={speaker} (timestamp={timestamp:.2f})")
-                        else:
-                            logger.warning(f"Unknown track '{most_recent_track}' in track history, using default 'prospect'")
-                    else:
-                        logger.warning("No track history available, using default 'prospect'")
+            if current_track and current_track in track_to_speaker:
+                speaker = track_to_speaker[current_track]
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Using current track for speaker mapping: track={current_track} -> speaker={speaker} (timestamp={timestamp:.2f})")
             else:
-                logger.warning("No connection info available, using default 'prospect'")
+                # Fallback: use the most recent track from history
+                track_history = connection_info.track_history
+                if track_history:
+                    # Get the most recent track
+                    _, most_recent_track = track_history[-1]
+                    if most_recent_track in track_to_speaker:
+                        speaker = track_to_speaker[most_recent_track]
+                        logger.info(f"Using track history for speaker mapping: track={most_recent_track} -> speaker={speaker} (timestamp={timestamp:.2f})")
+                    else:
+                        logger.warning(f"Unknown track '{most_recent_track}' in track history, using default 'prospect'")
+                else:
+                    logger.warning("No track history available, using default 'prospect'")
 
-            logger.info(f"Processing transcript: speaker={speaker}, text={sentence[:50]}..., timestamp={timestamp}")
+            logger.info("Processing transcript: speaker=%s, text=%.50s..., timestamp=%s", speaker, sentence, timestamp)
 
-            # Send to Laravel
-            await self.send_to_laravel(call_session_id, speaker, sentence, timestamp)
+            # Hand off to the call's drain task, which posts to Laravel
+            if connection_info.transcript_queue is not None:
+                try:
+                    connection_info.transcript_queue.put_nowait((speaker, sentence, timestamp))
+                except asyncio.QueueFull:
+                    logger.warning(f"Transcript queue full for call {call_session_id}, dropping transcript")
+            else:
+                await self.send_to_laravel(call_session_id, speaker, sentence, timestamp)
         except Exception as e:
             logger.error(f"Error processing transcript: {e}", exc_info=True)
 
-    async def send_to_laravel(self, call_session_id, speaker, text, timestamp):
-        """Send transcript chunk to Laravel API"""
-        if not call_session_id:
-            logger.warning("Attempted to send transcript without call_session_id")
-            return
+    async def drain_transcripts(self, connection_info, queue):
+        """Post queued transcripts for one call, coalescing bursts into batches"""
+        done = False
+
+        while not done:
+            item = await queue.get()
+            if item is None:
+                break
+            batch = [item]
+
+            if TRANSCRIPT_BATCH_MAX > 1:
+                # Give the rest of a burst a moment to arrive so it shares the POST
+                await asyncio.sleep(TRANSCRIPT_BATCH_WINDOW_MS / 1000)
 
-        url = f"{LARAVEL_API_URL}/api/media-stream"
+            # Pick up whatever else is waiting, without blocking
+            while len(batch) < TRANSCRIPT_BATCH_MAX:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+
+            call_session_id = connection_info.call_session_id
+            try:
+                if len(batch) == 1:
+                    await self.send_to_laravel(call_session_id, *batch[0])
+                elif not await self.send_batch_to_laravel(call_session_id, batch):
+                    # Laravel rejected the batch; deliver the transcripts one by one
+                    for speaker, text, timestamp in batch:
+                        await self.send_to_laravel(call_session_id, speaker, text, timestamp)
+            except Exception as e:
+                logger.error(f"Error draining transcripts for call {call_session_id}: {e}", exc_info=True)
+
+    def build_transcript_payload(self, call_session_id, speaker, text, timestamp):
+        """Build the JSON body Laravel expects for one transcript chunk"""
         # Ensure timestamp is a numeric value, not a method or object
         timestamp_value = float(timestamp) if timestamp is not None else 0.0
 
-        payload = {
-            'call_session_id': str(call_session_id),  # Ensure it's a string
-            'speaker': str(speaker),
-            'text': str(text),
+        # call_session_id is normalized to str when the stream is identified, speaker is
+        # one of the track_to_speaker values and text is Deepgram's transcript string
+        return {
+            'call_session_id': call_session_id,
+            'speaker': speaker,
+            'text': text,
             'timestamp': timestamp_value,
         }
 
-        logger.info(f"Sending transcript to Laravel: call_session_id={payload['call_session_id']}, speaker={payload['speaker']}, text_length={len(payload['text'])}, timestamp={payload['timestamp']}, text_preview={text[:50]}...")
+    def record_speaker_stats(self, call_session_id, speaker):
+        """Track speaker distribution for a call session and warn on one-sided calls"""
+        connection_info = self.active_streams.get(call_session_id)
+        if connection_info is None:
+            return
+
+        connection_info.speaker_stats[speaker] = connection_info.speaker_stats.get(speaker, 0) + 1
+        connection_info.total_transcripts += 1
+
+        # Log stats every 10 transcripts
+        total = connection_info.total_transcripts
+        if total % 10 == 0:
+            stats = connection_info.speaker_stats
+            va_count = stats.get('va', 0)
+            prospect_count = stats.get('prospect', 0)
+            logger.info("Speaker distribution for call %s (total=%d): VA=%d, Prospect=%d, System=%d",
+                        call_session_id, total, va_count, prospect_count, stats.get('system', 0))
+
+            # Warn if we're only seeing one speaker after many transcripts
+            if total >= 20:
+                if va_count == 0:
+                    logger.warning(f"WARNING: No VA transcripts detected after {total} transcripts. Check if speaker diarization is working correctly.")
+                elif prospect_count == 0:
+                    logger.warning(f"WARNING: No prospect transcripts detected after {total} transcripts. Check if speaker diarization is working correctly.")
+                elif va_count > 0 and prospect_count > 0:
+                    logger.info(f"✓ Both speakers detected: VA ({va_count}) and Prospect ({prospect_count})")
+
+    async def send_batch_to_laravel(self, call_session_id, transcripts):
+        """Send several transcript chunks to Laravel API in one request
+
+        Returns False only when Laravel answered with an error status, so the
+        caller can retry per transcript without risking duplicates.
+        """
+        if not call_session_id:
+            logger.warning("Attempted to send transcript batch without call_session_id")
+            return True
 
-        headers = {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json',
+        url = _LARAVEL_BATCH_URL
+        payload = {
+            'transcripts': [
+                self.build_transcript_payload(call_session_id, speaker, text, timestamp)
+                for speaker, text, timestamp in transcripts
+            ],
         }
 
-        if LARAVEL_API_TOKEN:
-            headers['Authorization'] = f'Bearer {LARAVEL_API_TOKEN}'
+        logger.info("Sending batch of %d transcripts to Laravel: call_session_id=%s", len(transcripts), call_session_id)
+
+        try:
+            session = await self.get_http_session()
+            async with session.post(url, data=orjson.dumps(payload)) as response:
+                if response.status in (200, 201):
+                    logger.info("Successfully sent batch of %d transcripts to Laravel", len(transcripts))
+                    for speaker, _, _ in transcripts:
+                        self.record_speaker_stats(call_session_id, speaker)
+                else:
+                    response_text = await response.text()
+                    logger.error(f"Failed to send transcript batch: HTTP {response.status} - {response_text}")
+                    return False
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout sending transcript batch to Laravel for call {call_session_id}")
+        except aiohttp.ClientError as e:
+            logger.error(f"Error sending batch to Laravel: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error sending batch to Laravel: {e}", exc_info=True)
+        return True
+
+    async def send_to_laravel(self, call_session_id, speaker, text, timestamp):
+        """Send transcript chunk to Laravel API"""
+        if not call_session_id:
+            logger.warning("Attempted to send transcript without call_session_id")
+            return
+
+        url = _LARAVEL_TRANSCRIPT_URL
+        payload = self.build_transcript_payload(call_session_id, speaker, text, timestamp)
+
+        logger.info("Sending transcript to Laravel: call_session_id=%s, speaker=%s, text_length=%d, timestamp=%s, text_preview=%.50s...",
+                    payload['call_session_id'], payload['speaker'], len(payload['text']), payload['timestamp'], text)
 
         try:
             session = await self.get_http_session()
-            async with session.post(url, json=payload, headers=headers) as response:
+            async with session.post(url, data=orjson.dumps(payload)) as response:
                 if response.status == 201:
-                    logger.info(f"Successfully sent transcript to Laravel: speaker={speaker}, text={text[:50]}...")
+                    logger.info("Successfully sent transcript to Laravel: speaker=%s, text=%.50s...", speaker, text)
 
                     # Track speaker distribution for this call session
-                    if call_session_id and call_session_id in self.active_streams:
-                        connection_info = self.active_streams[call_session_id]
-                        if 'speaker_stats' not in connection_info:
-                            connection_info['speaker_stats'] = {'va': 0, 'prospect': 0, 'system': 0}
-                        connection_info['speaker_stats'][speaker] = connection_info['speaker_stats'].get(speaker, 0) + 1
-                        self.active_streams[call_session_id] = connection_info
-
-                        # Log stats every 10 transcripts
-                        total = sum(connection_info['speaker_stats'].values())
-                        if total % 10 == 0:
-                            stats = connection_info['speaker_stats']
-                            va_count = stats.get('va', 0)
-                            prospect_count = stats.get('prospect', 0)
-                            logger.info(f"Speaker distribution for call {call_session_id} (total={total}): VA={va_count}, Prospect={prospect_count}, System={stats.get('system', 0)}")
-
-                            # Warn if we're only seeing one speaker after many transcripts
-                            if total >= 20:
-                                if va_count == 0:
-                                    logger.warning(f"WARNING: No VA transcripts detected after {total} transcripts. Check if speaker diarization is working correctly.")
-                                elif prospect_count == 0:
-                                    logger.warning(f"WARNING: No prospect transcripts detected after {total} transcripts. Check if speaker diarization is working correctly.")
-                                elif va_count > 0 and prospect_count > 0:
-                                    logger.info(f"✓ Both speakers detected: VA ({va_count}) and Prospect ({prospect_count})")
+                    self.record_speaker_stats(call_session_id, speaker)
                 elif response.status == 401:
                     response_text = await response.text()
                     logger.error(f"Authentication failed when sending transcript: HTTP {response.status} - {response_text}")
@@ -757,43 +1089,72 @@ class MediaStreamHandler:
         logger.info(f"Deepgram connection closed - args: {args}, kwargs: {kwargs}")
 
 
+async def graceful_shutdown(handler):
+    """Stop accepting calls and let open streams flush before exiting"""
+    # Closing the server closes each Twilio connection; their handlers then flush
+    # queued audio and transcripts and finish their Deepgram streams. Anything left
+    # over is cleaned up once main() sees the server has closed.
+    handler.server.close()
+    await handler.server.wait_closed()
+
+
+def create_listen_socket(port):
+    """Create the listening socket, shareable across worker processes"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    # Every worker binds the same port; the kernel load-balances accepts between them.
+    # A single worker leaves it off, so a second copy of the service fails with
+    # EADDRINUSE instead of silently taking a share of the calls.
+    if MEDIA_STREAM_WORKERS > 1:
+        if hasattr(socket, 'SO_REUSEPORT'):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        else:
+            logger.warning("SO_REUSEPORT not supported on this platform, extra workers will fail to bind")
+    sock.bind(("0.0.0.0", port))
+    return sock
+
+
 async def main():
     """Main entry point"""
     handler = MediaStreamHandler()
 
-    logger.info(f"Starting Media Stream Service on port {MEDIA_STREAM_PORT}...")
+    logger.info(f"Starting Media Stream Service on port {MEDIA_STREAM_PORT} (pid {os.getpid()})...")
     logger.info(f"Laravel API URL: {LARAVEL_API_URL}")
     logger.info(f"Deepgram API configured: {'Yes' if DEEPGRAM_API_KEY else 'No'}")
 
+    await handler.startup()
+
     # Create WebSocket server
-    # Note: The path parameter in handle_twilio_stream should include query parameters
+    # Note: The request path in handle_twilio_stream should include query parameters
     # If not, we'll extract them from the connected event message
-    handler.server = await websockets.serve(
+    handler.server = await serve(
         handler.handle_twilio_stream,
-        "0.0.0.0",
-        MEDIA_STREAM_PORT,
+        sock=create_listen_socket(MEDIA_STREAM_PORT),
         ping_interval=20,
         ping_timeout=10,
-        close_timeout=10
+        close_timeout=10,
+        # Twilio frames are a few hundred bytes and 'start' a few KB; a tighter cap
+        # bounds per-connection memory. Queue ~0.6s of frames while a handler is busy.
+        max_size=2**16,
+        max_queue=32,
+        # Base64 mu-law doesn't compress; skip permessage-deflate on every frame
+        compression=None,
     )
 
     logger.info(f"Media Stream Service started successfully on port {MEDIA_STREAM_PORT}")
     logger.info("Waiting for WebSocket connections on /stream path...")
 
-    # Set up signal handlers for graceful shutdown
-    def signal_handler(signum, frame):
+    # Set up signal handlers for graceful shutdown. They run on the event loop, so
+    # shutdown can await connections closing instead of interrupting arbitrary code.
+    loop = asyncio.get_running_loop()
+    shutdown_tasks = []
+
+    def signal_handler(signum):
         logger.info(f"Received signal {signum}, shutting down gracefully...")
-        handler.server.close()
-        for call_session_id in list(handler.active_streams.keys()):
-            stream_info = handler.active_streams.get(call_session_id)
-            if stream_info and 'deepgram' in stream_info:
-                try:
-                    stream_info['deepgram'].finish()
-                except Exception as e:
-                    logger.error(f"Error closing Deepgram connection: {e}")
+        shutdown_tasks.append(asyncio.create_task(graceful_shutdown(handler)))
 
-    signal.signal(signal.SIGTERM, signal_handler)
-    signal.signal(signal.SIGINT, signal_handler)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, signal_handler, signum)
 
     try:
         await handler.server.wait_closed()
@@ -801,26 +1162,67 @@ async def main():
     except Exception as e:
         logger.error(f"Error in server: {e}", exc_info=True)
     finally:
-        # Clean up remaining connections
-        for call_session_id in list(handler.active_streams.keys()):
-            stream_info = handler.active_streams.pop(call_session_id, None)
-            if stream_info and 'deepgram' in stream_info:
-                try:
-                    stream_info['deepgram'].finish()
-                except Exception:
-                    pass
+        # Wait for a signal-driven shutdown to finish rather than leaving it to be cancelled
+        if shutdown_tasks:
+            await asyncio.gather(*shutdown_tasks, return_exceptions=True)
+
+        # Clean up remaining connections. finish() blocks on the SDK's threads, so
+        # whatever is left is closed in parallel.
+        remaining = []
+        for call_session_id in list(handler.deepgram_connections.keys()):
+            remaining.append(handler.deepgram_connections.get(call_session_id))
+            handler.unregister_stream(call_session_id)
+        results = await asyncio.gather(
+            *(handler.loop.run_in_executor(handler.deepgram_control_executor, deepgram_connection.finish)
+              for deepgram_connection in remaining),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error closing Deepgram connection: {result}")
 
         # Close HTTP session if it exists
         if handler.http_session is not None and not handler.http_session.closed:
             await handler.http_session.close()
             logger.info("HTTP session closed")
 
+        # Every feed task and finish() has completed by now, so nothing is outstanding
+        handler.deepgram_send_executor.shutdown(wait=False)
+        handler.deepgram_control_executor.shutdown(wait=False)
 
-if __name__ == "__main__":
+
+def run_worker():
+    """Run one server process until it shuts down"""
+    # libuv-backed event loop when available; falls back to the stock asyncio loop.
+    # Chosen per worker so spawned (non-forked) workers get it as well.
     try:
-        asyncio.run(main())
+        import uvloop
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
+
+    try:
+        run(main())
     except KeyboardInterrupt:
         logger.info("Service interrupted by user")
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
         sys.exit(1)
+
+
+if __name__ == "__main__":
+    # Each extra worker runs its own event loop, HTTP session and Deepgram client
+    workers = [
+        multiprocessing.Process(target=run_worker, name=f"media-stream-worker-{i}")
+        for i in range(1, MEDIA_STREAM_WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+
+    try:
+        run_worker()
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()